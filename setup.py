@@ -14,8 +14,22 @@ single instance of an installed application or service, installed on a
 particular computer.
 """
 
+import os
+
 from setuptools import setup, find_packages
 
+# Optionally compile the (pure Python) utilities ahead of time with mypyc, e.g.
+#  for short-lived processes that would otherwise run them interpreted. This
+#  requires mypy to be installed in the build environment, i.e.
+#  DONORDATABASE_USE_MYPYC=1 pip install --no-build-isolation .
+ext_modules = []
+if os.environ.get("DONORDATABASE_USE_MYPYC", "0") == "1":
+    from mypyc.build import mypycify
+    # Only utils.py is compiled; its (untyped) imports are not type checked.
+    ext_modules = mypycify(["--ignore-missing-imports",
+                            "--follow-imports=silent",
+                            "src/donordatabase/utils.py"])
+
 setup(
     name="donordatabase",
     version="2024.0.0",
@@ -32,6 +46,9 @@ setup(
     install_requires=["pandas",
                       "pyqt6",
                       "matplotlib",
-                      "numpy"],
-    python_requires=">=3.8"
+                      "numpy",
+                      "pyarrow"],
+    extras_require={"numba": ["numba"], "polars": ["polars"]},
+    python_requires=">=3.10",
+    ext_modules=ext_modules
 )
@@ -3,7 +3,7 @@ The donor-database package.
 """
 from .database import DonorDatabase
 from .donor import Donor
-from .types import DonorLevel, DonorLevelStats, Payment
+from .types import DonorLevel, DonorLevelStats, Payment, PaymentTable
 
 # Define the package name
 # __name__ = "donordatabase"
@@ -13,4 +13,5 @@ __all__ = ["DonorDatabase",
            "Donor",
            "DonorLevel",
            "DonorLevelStats",
-           "Payment"]
+           "Payment",
+           "PaymentTable"]
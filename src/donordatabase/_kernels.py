@@ -0,0 +1,131 @@
+"""
+Compiled kernels for the DonorDatabase.
+
+By default, the (vectorized) NumPy implementations of the kernels are used.
+Loading the compiled kernels costs more per process than they save for
+typical database sizes, so compiling the per-donor aggregation with Numba
+(installed via the `numba` extra) is opt-in, by setting the environment
+variable DONORDATABASE_USE_NUMBA=1. The statistics of the (few) donor levels
+are always computed with NumPy.
+"""
+import os
+from typing import Tuple
+import warnings
+
+import numpy as np
+
+njit = None
+if os.environ.get('DONORDATABASE_USE_NUMBA', '0') == '1':
+    try:
+        from numba import njit
+    except ImportError:
+        warnings.warn(
+            "DONORDATABASE_USE_NUMBA=1 requires Numba, which is not "
+            "installed. Using the NumPy kernels instead.")
+
+
+def _aggregate_donors_numpy(
+        offsets: np.ndarray, amount: np.ndarray, type_code: np.ndarray,
+        level_uppers: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """The NumPy implementation of aggregate_donors."""
+    totals = np.add.reduceat(amount, offsets[:-1])
+    level_idx = np.searchsorted(level_uppers, np.abs(totals), side='right')
+
+    # Sort the rows by descending (masked) amount within each donor's block.
+    #  The sort is stable, so the first row of each block is the first row
+    #  with the largest amount.
+    donor = np.repeat(np.arange(offsets.size - 1), np.diff(offsets))
+    largest = []
+    for code in (0, 1):
+        masked = np.where(type_code == code, amount, 0)
+        idx = np.lexsort((-masked, donor))[offsets[:-1]]
+        largest.append(np.where(masked[idx] > 0, idx - offsets[:-1], -1))
+
+    return totals, level_idx, largest[0], largest[1]
+
+
+def _aggregate_donors_numba(
+        offsets: np.ndarray, amount: np.ndarray, type_code: np.ndarray,
+        level_uppers: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """The (fused, single pass) Numba implementation of aggregate_donors."""
+    n_donors = offsets.size - 1
+    totals = np.zeros(n_donors, dtype=np.int64)
+    largest_payment = np.full(n_donors, -1)
+    largest_donation = np.full(n_donors, -1)
+    for d in range(n_donors):
+        total = 0
+        payment_max = 0
+        donation_max = 0
+        for i in range(offsets[d], offsets[d + 1]):
+            total += amount[i]
+            if type_code[i] == 0 and amount[i] > payment_max:
+                payment_max = amount[i]
+                largest_payment[d] = i - offsets[d]
+            elif type_code[i] == 1 and amount[i] > donation_max:
+                donation_max = amount[i]
+                largest_donation[d] = i - offsets[d]
+        totals[d] = total
+    level_idx = np.searchsorted(level_uppers, np.abs(totals), side='right')
+
+    return totals, level_idx, largest_payment, largest_donation
+
+
+if njit is not None:
+    _aggregate_donors = njit(cache=True)(_aggregate_donors_numba)
+else:
+    _aggregate_donors = _aggregate_donors_numpy
+
+
+def aggregate_donors(
+        offsets: np.ndarray, amount: np.ndarray, type_code: np.ndarray,
+        level_uppers: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the total contributions, the level index (into _LEVELS) and the
+    largest payment and largest donation of every donor.
+
+    Args:
+        offsets: The payment rows of the i-th donor are
+            offsets[i]:offsets[i + 1].
+        amount: The amount of every payment, in cents (int64).
+        type_code: The contribution type code (see CONTRIBUTION_TYPES) of
+            every payment.
+        level_uppers: The upper bound of every DonorLevel, in cents.
+
+    Returns:
+        The total contributions (in cents), the level index, and the index
+        (within the donor's block of rows) of the largest payment and of the
+        largest donation (-1 if none) of every donor.
+    """
+    return _aggregate_donors(offsets, amount, type_code, level_uppers)
+
+
+def level_stats(
+        amounts: np.ndarray, begins: np.ndarray, counts: np.ndarray
+) -> Tuple[np.ndarray, ...]:
+    """
+    Computes the statistics of the payment amounts at every donor level.
+
+    Args:
+        amounts: The payment amounts in cents (int64), ordered by level, such
+            that the payments of the i-th level are
+            amounts[begins[i]:begins[i] + counts[i]].
+        begins: The first row of every level.
+        counts: The number of payments at every level.
+
+    Returns:
+        The total, max, min, mean, (population) std and median of the
+        payment amounts at every level, in cents.
+    """
+    total = np.add.reduceat(amounts, begins)
+    mean = total / counts
+    variance = np.add.reduceat(
+        (amounts - np.repeat(mean, counts)) ** 2, begins) / counts
+    median = np.array([np.median(amounts[begin:begin + count])
+                       for begin, count in zip(begins, counts)])
+
+    return (total, np.maximum.reduceat(amounts, begins),
+            np.minimum.reduceat(amounts, begins), mean, np.sqrt(variance),
+            median)
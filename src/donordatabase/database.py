@@ -2,18 +2,50 @@
 The AAC Database module.
 """
 import datetime
-from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import os
 from pathlib import Path
 from time import perf_counter_ns
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 import warnings
 
 import pandas as pd
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import numpy as np
+import pyarrow as pa
+from pyarrow import csv
+import pyarrow.parquet as pq
 
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+from ._kernels import aggregate_donors, level_stats
 from .donor import Donor
-from .types import DonorLevel, DonorLevelStats, Name
+from .types import CONTRIBUTION_TYPES, DonorLevel, DonorLevelStats, Name, \
+    Payment, PaymentTable, _LEVELS, _LEVEL_UPPERS
+from .utils import to_cents, to_list
+
+# The type of every column of a CSV file. An explicit schema is provided rather
+#  than having PyArrow infer the column types (e.g. an entirely blank column
+#  would be inferred as null). It is also used to validate a cached Table.
+_CSV_COLUMN_TYPES = {
+    'transaction_id': pa.int64(),
+    'user_id': pa.int64(),
+    'amount': pa.float64(),
+    'gl_code': pa.int64(),
+    'postal': pa.int64()
+}
+_CSV_COLUMN_TYPES.update({column: pa.timestamp('us') for column in [
+    'actual_date', 'posted_date', 'membership_expiration_date'
+]})
+_CSV_COLUMN_TYPES.update({column: pa.string() for column in [
+    'type', 'firstname', 'lastname', 'full_name', 'email', 'payment_type',
+    'response_meta', 'street_1', 'street_2', 'city', 'state'
+]})
 
 
 class DonorDatabase:
@@ -21,86 +53,236 @@ class DonorDatabase:
     Stores a database of Donors and useful metadata, e.g. largest individual
     payment/donation, highest contributing donor, etc.
     """
-    def __init__(self, filepath: Union[str, Path, List[str], List[Path]]):
+    def __init__(self, filepath: Union[str, Path, List[str], List[Path]],
+                 backend: str = 'pandas'):
         """
         Args:
             filepath: A single file path or list of file paths from which to
                 create the database.
+            backend: The DataFrame library used to load the files, either
+                'pandas' or 'polars'. With 'polars', the donor level
+                statistics are computed along with loading the data, which is
+                then converted to a Pandas DataFrame.
         """
+        if backend not in ('pandas', 'polars'):
+            raise ValueError(
+                f"Backend '{backend}' is not supported. Valid backends are "
+                f"[pandas, polars].")
+        if backend == 'polars' and pl is None:
+            raise ImportError(
+                "The 'polars' backend requires Polars. Install it via "
+                "'pip install polars'.")
+
         # Convert to list if only a single path is provided
         if not isinstance(filepath, list):
             filepath = [filepath]
 
-        print("DataFrame profiling:")
-        self._dataframes = []
+        # Convert to Path and check that all file types are supported before
+        #  loading any of the files
+        filepath = [Path(path) for path in filepath]
         for path in filepath:
-            if isinstance(path, str):
-                path = Path(path)
-
-            if path.suffix == '.csv':
-                self._dataframes.append(self._load_from_csv(path))
-            elif path.suffix == '.xlsx':
-                self._dataframes.append(self._load_from_excel(path))
-            else:
+            if path.suffix not in ('.csv', '.xlsx'):
                 raise ValueError(
                     f"Filetype '{path.suffix}' is not supported. Valid file "
                     f"types are [.csv, .xlsx].")
 
-        # Concatenate all dataframes into a single dataframe
-        start = perf_counter_ns()
-        self._df = pd.concat(self._dataframes, ignore_index=True)
-        stop = perf_counter_ns()
-        print(f"\tconcatenate {len(self._dataframes)} DFs:\t\t\t\t"
-              f"{int((stop - start) * 1e-6)} ms")
+        # Load the files in parallel. The CSV/Parquet readers release the GIL,
+        #  so threads suffice. The loaded Tables (or LazyFrames) retain the
+        #  order of the file paths.
+        print("DataFrame profiling:")
+        with ThreadPoolExecutor(
+                max_workers=min(len(filepath), os.cpu_count() or 1)) as pool:
+            tables = list(pool.map(
+                lambda path: self._load_file(path, backend), filepath))
 
-        # Store all payments for all donors in the database
-        self._payments = {}
+        # Statistics of the payments at each donor level (indexed by level
+        #  index). Precomputed by the 'polars' backend, otherwise computed
+        #  on demand.
+        self._level_stats = None
 
-        # Create the donor dict by iterating over the entire DataFrame
+        # Concatenate all dataframes into a single dataframe
+        if backend == 'polars':
+            self._df, self._level_stats = \
+                self._collect_polars(pl.concat(tables))
+            del tables
+        else:
+            # Concatenating the Tables only gathers their chunks (no copy),
+            #  so the rows are copied only once, by the conversion to Pandas.
+            #  Column types that differ between the Tables (e.g. string vs.
+            #  large_string) are unified. String columns remain Arrow-backed.
+            #  The Tables are no longer referenced once concatenated, so the
+            #  conversion may release each column once it has been converted.
+            start = perf_counter_ns()
+            n_tables = len(tables)
+            arrow_table = pa.concat_tables(tables,
+                                           promote_options='permissive')
+            del tables
+            string = pd.StringDtype('pyarrow')
+            self._df = arrow_table.to_pandas(
+                types_mapper={pa.string(): string,
+                              pa.large_string(): string}.get,
+                split_blocks=True, self_destruct=True
+            ).astype({'gl_code': 'Int64', 'postal': 'Int64'})
+            del arrow_table
+            stop = perf_counter_ns()
+            print(f"\tconcatenate {n_tables} tables:\t\t\t"
+                  f"{int((stop - start) * 1e-6)} ms")
+
+        # Create a Donor for each unique user ID (in order of first
+        #  appearance). The donor info is taken from the first row in which
+        #  each user ID appears.
         start = perf_counter_ns()
-        self._donors = {}
-        for row in self._df.itertuples():
-            if row.user_id not in self._donors:
-                # Add the donor to the donor list
-                self._donors[row.user_id] = Donor(
-                    user_id=row.user_id,
-                    firstname=row.firstname,
-                    lastname=row.lastname,
-                    fullname=row.full_name,
-                    email=row.email,
-                    street1=row.street_1,
-                    street2=row.street_2,
-                    city=row.city,
-                    state=row.state,
-                    postal=row.postal,
-                    membership_exp=row.membership_expiration_date
-                )
 
-            # Add a new payment for this donor
-            payment = self._donors[row.user_id].add_payment(
-                transaction_id=row.transaction_id,
+        # Strip leading/trailing white space from all string fields a column at
+        #  a time, and remove unwanted additional spaces between first/last
+        #  names when creating the fullname.
+        for column in ['firstname', 'lastname', 'email', 'street_1',
+                       'street_2', 'city', 'state']:
+            self._df[column] = self._df[column].str.strip()
+        full_name = self._df['full_name'].fillna('') \
+            .str.replace(r'\s+', ' ', regex=True).str.strip()
+        self._df['full_name'] = full_name.where(
+            full_name != '',
+            self._df['firstname'] + ' ' + self._df['lastname'])
+
+        # Store the contribution types as a categorical column, i.e. as int8
+        #  codes (see CONTRIBUTION_TYPES) rather than as strings.
+        unknown = ~self._df['type'].isin(CONTRIBUTION_TYPES)
+        if unknown.any():
+            raise ValueError(
+                f"Unknown contribution type(s) "
+                f"{sorted(self._df.loc[unknown, 'type'].unique())}. Valid "
+                f"contribution types are {CONTRIBUTION_TYPES}.")
+        self._df['type'] = self._df['type'].astype(
+            pd.CategoricalDtype(CONTRIBUTION_TYPES))
+
+        # Every payment must have a (finite) amount, otherwise the totals
+        #  (computed in cents) would be meaningless
+        amount = self._df['amount'].to_numpy(dtype=np.float64,
+                                             na_value=np.nan)
+        invalid = ~np.isfinite(amount)
+        if invalid.any():
+            raise ValueError(
+                f"Payment(s) "
+                f"{self._df.loc[invalid, 'transaction_id'].tolist()} have a "
+                f"missing or non-finite 'amount'.")
+
+        donor_rows = self._df.drop_duplicates('user_id', keep='first')
+        # The expiration dates are datetimes, as for a Payment's dates
+        membership_exp = to_list(donor_rows['membership_expiration_date'])
+        donor_rows = donor_rows.astype(object).where(donor_rows.notna(), None)
+        self._donors = {
+            row.user_id: Donor(
                 user_id=row.user_id,
-                contribution_type=row.type,
-                actual_date=row.actual_date,
-                posted_date=row.posted_date,
-                payment_type=row.payment_type,
-                response_meta=row.response_meta,
-                amount=row.amount,
-                gl_code=row.gl_code
+                firstname=row.firstname,
+                lastname=row.lastname,
+                fullname=row.full_name,
+                email=row.email,
+                street1=row.street_1,
+                street2=row.street_2,
+                city=row.city,
+                state=row.state,
+                postal=row.postal,
+                membership_exp=expiration
+            ) for row, expiration in zip(donor_rows.itertuples(),
+                                         membership_exp)
+        }
+
+        # Compute the contributions (by contribution type) of every donor via a
+        #  single (exact, in cents) groupby-sum rather than accumulating them
+        #  payment-by-payment.
+        contributions = pd.Series(to_cents(self._df['amount'].to_numpy())) \
+            .groupby([self._df['user_id'].to_numpy(),
+                      self._df['type'].array], observed=True).sum() \
+            .unstack(fill_value=0).div(100).to_dict('index')
+
+        # Order the rows by donor so that each donor's payments occupy a
+        #  contiguous block of rows. The sort is stable, so each donor's
+        #  payments retain their original order.
+        donor_idx, _ = pd.factorize(self._df['user_id'])
+        order = np.argsort(donor_idx, kind='stable')
+        self._donor_offsets = np.searchsorted(
+            donor_idx[order], np.arange(len(self._donors) + 1))
+        counts = np.diff(self._donor_offsets)
+
+        # Store the payments in a columnar (struct-of-arrays) PaymentTable
+        #  ordered by donor. The payments of the i-th donor occupy the rows
+        #  _donor_offsets[i]:_donor_offsets[i + 1] of every column. Each
+        #  payment carries the name and address of its donor, i.e. of the
+        #  first row of its donor's block. These are repeated from the donor
+        #  rows (as references to the same strings) rather than copied.
+        records = {
+            name: self._df[column].array.take(order) for name, column in [
+                ('transaction_id', 'transaction_id'), ('user_id', 'user_id'),
+                ('contribution_type', 'type'),
+                ('actual_date', 'actual_date'), ('posted_date', 'posted_date'),
+                ('payment_type', 'payment_type'),
+                ('response_meta', 'response_meta'), ('amount', 'amount'),
+                ('gl_code', 'gl_code')]
+        }
+        for name, column in [
+                ('firstname', 'firstname'), ('lastname', 'lastname'),
+                ('fullname', 'full_name'), ('email', 'email'),
+                ('street1', 'street_1'), ('street2', 'street_2'),
+                ('city', 'city'), ('state', 'state'), ('postal', 'postal')]:
+            records[name] = np.repeat(donor_rows[column].to_numpy(), counts)
+        self._payment_table = table = PaymentTable.from_records(records)
+        del records, donor_rows
+
+        # Compute the total contributions, level index (into _LEVELS) and
+        #  largest payment and donation of every donor in a single (compiled,
+        #  if Numba is enabled, see _kernels) pass over each donor's
+        #  (contiguous) block of payments, for either backend. The totals are
+        #  (exact) sums of the amounts in cents.
+        user_ids = table.user_id[self._donor_offsets[:-1]]
+        totals, level_idx, largest_payment, largest_donation = \
+            aggregate_donors(self._donor_offsets, table.amount_cents,
+                             table.contribution_type.codes, _LEVEL_UPPERS)
+        self._donor_totals = pd.Series(totals, index=user_ids)
+        self._donor_level_idx = pd.Series(level_idx, index=user_ids)
+
+        # Hand each donor its block of rows of the PaymentTable. The Payments
+        #  are only created when first accessed.
+        for (user_id, donor), begin, end, payment_idx, donation_idx in zip(
+                self._donors.items(), self._donor_offsets[:-1].tolist(),
+                self._donor_offsets[1:].tolist(), largest_payment.tolist(),
+                largest_donation.tolist()):
+            donor.extend_payments(
+                table,
+                contributions=contributions[user_id],
+                largest={'Payment': payment_idx, 'Donation': donation_idx},
+                rows=slice(begin, end)
             )
-            if payment:
-                if payment.transaction_id in self._payments:
-                    warnings.warn(
-                        f"A payment with Transaction ID "
-                        f"'{payment.transaction_id}' (User ID: "
-                        f"'{self._payments[payment.transaction_id].user_id}', "
-                        f"amount: $"
-                        f"{self._payments[payment.transaction_id].amount:.2f}) "
-                        f"has already been added to the "
-                        f"the {self.__class__.__name__}. The current payment "
-                        f"of ${payment.amount:.2f} is associated with User ID "
-                        f"'{payment.user_id}'.")
-                self._payments[payment.transaction_id] = payment
+
+        # The row (of the PaymentTable) of every payment in the original row
+        #  order. Of the payments that share a transaction ID, only the last
+        #  is stored in the database (see _get_payments).
+        self._rows = np.empty(len(order), dtype=np.int64)
+        self._rows[order] = np.arange(len(order))
+        self._payments = None
+
+        # Warn about duplicate transaction IDs. These are detected in a single
+        #  vectorized pass, so only the rows that share a transaction ID with
+        #  another row are visited here, and no Payments are created.
+        shared = self._rows[np.flatnonzero(
+            self._df.duplicated('transaction_id', keep=False).to_numpy())]
+        previous = {}
+        for transaction_id, user_id, amount in zip(
+                table.transaction_id[shared].tolist(),
+                table.user_id[shared].tolist(),
+                table.amount[shared].tolist()):
+            if transaction_id in previous:
+                warnings.warn(
+                    f"A payment with Transaction ID "
+                    f"'{transaction_id}' (User ID: "
+                    f"'{previous[transaction_id][0]}', "
+                    f"amount: $"
+                    f"{previous[transaction_id][1]:.2f}) "
+                    f"has already been added to the "
+                    f"the {self.__class__.__name__}. The current payment "
+                    f"of ${amount:.2f} is associated with User ID "
+                    f"'{user_id}'.")
+            previous[transaction_id] = (user_id, amount)
         stop = perf_counter_ns()
         print(f"\tcreate DonorDatabase ({len(self._donors)}):\t"
               f"{int((stop - start) * 1e-6)} ms")
@@ -112,8 +294,6 @@ class DonorDatabase:
         #  level, rtc.
         self._donors_by_contribution = None
         self._donors_by_level = None
-        self._payments_by_date = None
-        self._payments_by_date_list = None
         self._donor_level_stats = None
 
     @property
@@ -127,34 +307,38 @@ class DonorDatabase:
     @property
     def top_donor(self) -> Donor:
         if self._top_donor is None:
-            max_contribution = 0.0
-            for donor in self._donors.values():
-                if donor.total_contributions > max_contribution:
-                    max_contribution = donor.total_contributions
-                    self._top_donor = donor
+            self._top_donor = self._donors[self._donor_totals.idxmax()]
         return self._top_donor
 
     @property
     def total_contributions(self) -> float:
         if self._total_contributions is None:
-            self._total_contributions = 0.0
-            for donor in self._donors.values():
-                self._total_contributions += donor.total_contributions
+            self._total_contributions = float(self._donor_totals.sum() / 100)
         return self._total_contributions
 
     @property
-    def earliest_payment(self) -> datetime.datetime:
-        if self._payments_by_date_list is None:
-            self._create_payments_by_date()
+    def payments(self) -> Dict[int, Payment]:
+        """
+        All payments in the database by transaction ID. A later payment with
+        the same transaction ID replaces an earlier one. The Payments are
+        created (all at once) on first access, and are the same Payments as
+        those of the donors.
+        """
+        if self._payments is None:
+            payments = np.empty(len(self._payment_table), dtype=object)
+            payments[:] = self._payment_table.to_payments()
+            self._payments = dict(zip(
+                self._df['transaction_id'].tolist(),
+                payments[self._rows].tolist()))
+        return self._payments
 
-        return self._payments_by_date_list[0].posted_date
+    @property
+    def earliest_payment(self) -> datetime.datetime:
+        return self._posted_dates().min().to_pydatetime()
 
     @property
     def latest_payment(self) -> datetime.datetime:
-        if self._payments_by_date_list is None:
-            self._create_payments_by_date()
-
-        return self._payments_by_date_list[-1].posted_date
+        return self._posted_dates().max().to_pydatetime()
 
     @property
     def timespan(self) -> datetime.timedelta:
@@ -170,15 +354,15 @@ class DonorDatabase:
         Returns:
             A list of the n largest Donors by total contributions.
         """
+        if n < 0:
+            raise ValueError(
+                f"The number of donors must be non-negative, got {n}.")
+
         if self._donors_by_contribution is None:
-            self._create_donors_by_contribution()
+            # Avoid sorting all donors when only the top n are required
+            return self._get_top_donors_partitioned(n)
 
-        top_donors = []
-        for idx, donor in enumerate(self._donors_by_contribution.values()):
-            if idx > n:
-                break
-            top_donors.append(donor)
-        return top_donors
+        return list(islice(self._donors_by_contribution.values(), n))
 
     def get_donors_by_level(self, level: Optional[DonorLevel] = None) -> \
             Union[Dict[DonorLevel, List[Donor]], List[Donor]]:
@@ -196,12 +380,17 @@ class DonorDatabase:
                 #  grouping them by contribution level
                 self._create_donors_by_contribution()
 
-            self._donors_by_level = {}
-            for donor in self._donors_by_contribution.values():
-                if donor.level not in self._donors_by_level:
-                    self._donors_by_level[donor.level] = [donor]
-                else:
-                    self._donors_by_level[donor.level].append(donor)
+            # Group the (ordered) donors by level index via a single groupby.
+            #  The groups retain the order of the donors, i.e. the highest
+            #  level appears first.
+            level_idx = self._donor_level_idx[
+                list(self._donors_by_contribution)]
+            self._donors_by_level = {
+                _LEVELS[idx]: [self._donors[user_id]
+                               for user_id in user_ids.tolist()]
+                for idx, user_ids in
+                level_idx.groupby(level_idx, sort=False).groups.items()
+            }
 
         if level in self._donors_by_level:
             return self._donors_by_level[level]
@@ -219,28 +408,52 @@ class DonorDatabase:
                 returned.
         """
         if self._donor_level_stats is None:
+            # Give each payment the level index of its donor and order the
+            #  payments by level. The sort is stable, so the payments at each
+            #  level retain their order. The payments at each level then
+            #  occupy a contiguous block, from which the statistics are
+            #  computed.
+            payment_level_idx = np.repeat(self._donor_level_idx.to_numpy(),
+                                          np.diff(self._donor_offsets))
+            order = np.argsort(payment_level_idx, kind='stable')
+            amounts = self._payment_table.amount[order]
+            amounts_cents = self._payment_table.amount_cents[order]
+            level_idx, begins, counts = np.unique(
+                payment_level_idx[order], return_index=True,
+                return_counts=True)
+            ends = begins + counts
+
+            if self._level_stats is None:
+                # The statistics are computed in cents
+                total, max_, min_, mean, std, median = level_stats(
+                    amounts_cents, begins, counts)
+                self._level_stats = pd.DataFrame({
+                    'sum': total / 100,
+                    'count': counts,
+                    'max': max_ / 100,
+                    'min': min_ / 100,
+                    'mean': mean / 100,
+                    'median': median / 100,
+                    'std': std / 100
+                }, index=level_idx)
+            stats = {_LEVELS[idx]: row for idx, row in
+                     self._level_stats.to_dict('index').items()}
+            payments = {_LEVELS[idx]: amounts[begin:end]
+                        for idx, begin, end in zip(level_idx, begins, ends)}
+
             donor_level_stats = {}
             for lvl, donors in self.get_donors_by_level().items():
-                n_contributions = 0
-                total_contributions = 0
-                payments = []
-                for donor in donors:
-                    n_contributions += donor.num_payments
-                    total_contributions += donor.total_contributions
-                    payments.extend([p.amount for p in donor.payments.values()])
-
-                payments = np.array(payments)
                 donor_level_stats[lvl] = DonorLevelStats(
                     level=lvl,
                     n_donors=len(donors),
-                    n_payments=n_contributions,
-                    total=total_contributions,
-                    payments=payments,
-                    max=payments.max(),
-                    min=payments.min(),
-                    mean=payments.mean(),
-                    std=payments.std(),
-                    median=np.median(payments)
+                    n_payments=stats[lvl]['count'],
+                    total=stats[lvl]['sum'],
+                    payments=payments[lvl],
+                    max=stats[lvl]['max'],
+                    min=stats[lvl]['min'],
+                    mean=stats[lvl]['mean'],
+                    std=stats[lvl]['std'],
+                    median=stats[lvl]['median']
                 )
             self._donor_level_stats = donor_level_stats
 
@@ -291,18 +504,18 @@ class DonorDatabase:
         n_bins = 100
 
         if colorized:
-            n, bins, patches = plt.hist(data,
-                                        bins=n_bins,
-                                        facecolor='#2ab0ff',
-                                        edgecolor='#e0e0e0',
-                                        linewidth=0.5,
-                                        alpha=0.7)
-
-            # n MUST be an integer
-            n = n.astype('int')
-            for i in range(len(patches)):
-                # Choose colormap of your taste
-                patches[i].set_facecolor(plt.cm.viridis(n[i] / max(n)))
+            # Bin the data first so that the color of every bar can be
+            #  computed from the bin counts in a single colormap call, rather
+            #  than setting the color of each patch in a Python loop
+            n, bins = np.histogram(data, bins=n_bins)
+            plt.bar(bins[:-1],
+                    n,
+                    width=np.diff(bins),
+                    align='edge',
+                    color=plt.cm.viridis(n / n.max()),
+                    edgecolor='#e0e0e0',
+                    linewidth=0.5,
+                    alpha=0.7)
 
             # # Make one bin stand out (set color and opacity)
             # patches[47].set_fc('red')
@@ -331,28 +544,28 @@ class DonorDatabase:
 
     def plot_payment_date_hist(self):
         """Creates a histogram of all payments by date."""
-        # Create the dataset
-        dates = [p.posted_date for p in self._payments.values()]
-        unique_dates = set(dates)
-
-        n_bins = len(unique_dates)
-        n, bins, patches = plt.hist(x=dates,
-                                    bins=n_bins,
-                                    facecolor='#2ab0ff',
-                                    edgecolor='#e0e0e0',
-                                    linewidth=0.5,
-                                    alpha=0.7)
+        # Create the dataset directly from the DataFrame columns
+        dates = self._posted_dates().to_numpy()
+        unique_dates = np.unique(dates)
+
+        # Bin the dates (as Matplotlib date numbers) and color every bar from
+        #  the bin counts in a single colormap call
+        n_bins = unique_dates.size
+        n, bins = np.histogram(mdates.date2num(dates), bins=n_bins)
+        plt.bar(mdates.num2date(bins[:-1]),
+                n,
+                width=np.diff(bins),
+                align='edge',
+                color=plt.cm.viridis(n / n.max()),
+                edgecolor='#e0e0e0',
+                linewidth=0.5,
+                alpha=0.7)
 
         date_range = pd.date_range(
             start=self.earliest_payment,
             end=self.latest_payment,
             periods=int(self.timespan.days / 30)
         )
-        for i in range(len(patches)):
-            # Choose colormap of your taste
-            patches[i].set_facecolor(
-                plt.cm.viridis(n[i] / max(n.astype('int'))))
-
         plt.title("Payment Date Distribution", fontsize=12)
         plt.xticks(ticks=date_range, rotation=-45)
         plt.xlabel('Payment Value [$]', fontsize=10)
@@ -364,76 +577,217 @@ class DonorDatabase:
         """
         Creates a dictionary of donors ordered by total contributions.
 
-        TODO: This method of sorting a dictionary by an attribute of its values
-          seems pretty inefficient. There must be a better way to do this, but
-          I'm not having much luck googling "sort dictionary by attribute value"
+        The donors are ordered via a single argsort of the donor totals. The
+        sort is stable, so donors with equal total contributions retain their
+        original order. Since Python 3.7, a dict preserves insertion order, so
+        an OrderedDict is not necessary.
         """
-        # Use an OrderedDict to store donors ordered by total contribution.
-        # NOTE: 'total_contribution' is not unique to each donor and thus this
-        #   method will not work.
-        # Takes ~11ms
-        # start = perf_counter_ns()
-        # donors = {d.total_contributions: d for d in self._donors.values()}
-        # self._donors_by_contribution = \
-        #     OrderedDict(sorted(donors.items(), reverse=True))
-        # stop = perf_counter_ns()
-        # print(f"OrderedDict:\t{(stop - start) * 1e-6} ms")
-
-        # Sort the _donors dict via a lambda (takes ~15ms)
         start = perf_counter_ns()
-        # First get a list of sorted keys
-        sorted_keys = sorted(
-            self._donors,
-            key=lambda user_id: self._donors[user_id].total_contributions,
-            reverse=True)
-
-        # Then create the ordered dict by iterating through the sorted keys
-        self._donors_by_contribution = OrderedDict()
-        for key in sorted_keys:
-            self._donors_by_contribution[key] = self._donors[key]
+        user_ids = self._donor_totals.index.to_numpy()
+        order = np.argsort(-self._donor_totals.to_numpy(), kind='stable')
+        self._donors_by_contribution = {
+            user_id: self._donors[user_id]
+            for user_id in user_ids[order].tolist()}
         stop = perf_counter_ns()
         print(f"sort Donors by total contributions:\t"
               f"{(stop - start) * 1e-6:.2f} ms")
 
-    def _create_payments_by_date(self) -> None:
+    def _get_top_donors_partitioned(self, n: int) -> List[Donor]:
+        """
+        Returns the n largest donors without sorting all donors. The n-th
+        largest total is found via np.partition (O(N)), and only the donors
+        with a total at least that large are sorted. Ties are ordered in the
+        same way as in _create_donors_by_contribution.
+
+        Args:
+            n: The (non-negative) number of donors to return.
+        """
+        totals = self._donor_totals.to_numpy()
+        if n == 0:
+            return []
+        elif n < totals.size:
+            threshold = -np.partition(-totals, n - 1)[n - 1]
+            candidates = np.flatnonzero(totals >= threshold)
+        else:
+            candidates = np.arange(totals.size)
+
+        order = np.argsort(-totals[candidates], kind='stable')[:n]
+        user_ids = self._donor_totals.index.to_numpy()[candidates[order]]
+        return [self._donors[user_id] for user_id in user_ids.tolist()]
+
+    def _posted_dates(self) -> pd.Series:
+        """
+        Returns the posted date of every payment in the database, directly
+        from the DataFrame columns. As for a Payment, a missing posted date
+        falls back to the actual date, and of the payments that share a
+        transaction ID only the last is kept.
+        """
+        return self._df['posted_date'].fillna(self._df['actual_date'])[
+            ~self._df.duplicated('transaction_id', keep='last')]
+
+    def _load_file(self, filepath: Path, backend: str) -> \
+            Union[pa.Table, 'pl.LazyFrame']:
+        """
+        Loads a single (.csv or .xlsx) file for the given backend.
+
+        Args:
+            filepath: The path to the file.
+            backend: Either 'pandas' or 'polars'.
+
+        Returns:
+            A PyArrow Table, or a Polars LazyFrame for the 'polars' backend.
         """
-        Create a dict of payments ordered by date, oldest to most recent.
+        if filepath.suffix == '.csv':
+            if backend == 'polars':
+                return self._scan_csv_polars(filepath)
+            return self._load_from_csv(filepath)
+
+        df = self._load_from_excel(filepath)
+        if backend == 'polars':
+            # Use the same column types as a scanned CSV file (e.g. the
+            #  precision of the dates), so that the LazyFrames can be
+            #  concatenated
+            return pl.from_pandas(df).lazy().cast(
+                self._polars_schema())
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def _load_from_csv(self, filepath: Path) -> pa.Table:
         """
-        # Note that the method below will not work because the 'posted_date' is
-        #  not a unique feature of a payment. Ordering the payments in this way
-        #  will result in a dictionary that does not contain all the original
-        #  payments since only one payment per posted_date can exist.
-        # payments = {p.posted_date: p for p in self._payments.values()}
-        # self._payments_by_date = \
-        #     OrderedDict(sorted(payments.items(), reverse=True))
-        # self._payments_by_date_list = list(self._payments_by_date.values())
+        Creates a PyArrow Table from a CSV file.
 
+        The Table is cached as a (hidden) Parquet file alongside the CSV file,
+        e.g. 'payments.csv' is cached as '.payments.donordatabase.parquet'. If
+        the cache is newer than the CSV file and has the expected schema, the
+        Table is loaded from the cache instead, which is much faster than
+        parsing the CSV file again.
+
+        Args:
+            filepath:
+
+        Returns:
+            A PyArrow Table.
+        """
+        cache = filepath.with_name(f".{filepath.stem}.donordatabase.parquet")
+        if cache.exists() and \
+                cache.stat().st_mtime > filepath.stat().st_mtime:
+            start = perf_counter_ns()
+            try:
+                schema = pq.read_schema(cache)
+                valid = all(
+                    name in schema.names and schema.field(name).type == type_
+                    for name, type_ in _CSV_COLUMN_TYPES.items())
+            except (OSError, pa.ArrowInvalid):
+                valid = False
+            if valid:
+                table = pq.read_table(cache)
+                stop = perf_counter_ns()
+                print(f"\tload from .parquet:\t\t\t\t"
+                      f"{int((stop - start) * 1e-6)} ms")
+                return table
+            warnings.warn(f"Ignoring the cache '{cache}' of '{filepath}', "
+                          f"which does not have the expected schema.")
+
+        # Only empty strings are treated as missing values (like
+        #  'keep_default_na=False'), and only in the numeric and date columns,
+        #  e.g. a blank 'gl_code' or 'postal' is null, while a blank
+        #  'street_2' remains an empty string. The PyArrow CSV reader is
+        #  multithreaded. Providing the date format means each date column
+        #  is parsed in a single vectorized pass.
         start = perf_counter_ns()
-        sorted_keys = sorted(
-            self._payments,
-            key=lambda trans_id: self._payments[trans_id].posted_date
+        table = csv.read_csv(
+            filepath,
+            read_options=csv.ReadOptions(skip_rows=1),
+            convert_options=csv.ConvertOptions(
+                column_types=_CSV_COLUMN_TYPES,
+                null_values=[''],
+                strings_can_be_null=False,
+                timestamp_parsers=['%Y-%m-%d']
+            )
         )
-        self._payments_by_date = OrderedDict()
-        for key in sorted_keys:
-            self._payments_by_date[key] = self._payments[key]
-        self._payments_by_date_list = list(self._payments_by_date.values())
         stop = perf_counter_ns()
-        print(f"sort payments by date:\t{(stop - start) * 1e-6:.2f} ms")
+        print(f"\tload from .csv:\t\t\t\t\t{int((stop - start) * 1e-6)} ms")
+
+        try:
+            pq.write_table(table, cache, compression='zstd')
+        except OSError as e:
+            warnings.warn(f"Unable to cache '{filepath}' as '{cache}': {e}")
+
+        return table
 
-    def _load_from_csv(self, filepath: Path) -> pd.DataFrame:
+    def _scan_csv_polars(self, filepath: Path) -> 'pl.LazyFrame':
         """
-        Creates a Pandas DataFrame from a CSV file.
+        Lazily scans a CSV file with Polars. The type of every column is
+        given by _CSV_COLUMN_TYPES, as for _load_from_csv, so the schema
+        matches that of the 'pandas' backend, and that of every other file.
+
         Args:
             filepath:
 
         Returns:
-            A Pandas Dataframe.
+            A Polars LazyFrame.
+        """
+        # Skip the first (title) row of the file, and keep empty strings as
+        #  such, rather than as nulls (like 'keep_default_na=False').
+        return pl.scan_csv(filepath, skip_rows=1, empty_string_is_null=False,
+                           schema_overrides=self._polars_schema())
+
+    @staticmethod
+    def _polars_schema() -> Dict[str, 'pl.DataType']:
         """
+        Returns the Polars type of every column, i.e. the Polars equivalents
+        of _CSV_COLUMN_TYPES, so that no column type is inferred (per file).
+        """
+        return dict(pl.from_arrow(
+            pa.schema(_CSV_COLUMN_TYPES).empty_table()).schema)
+
+    def _collect_polars(self, lf: 'pl.LazyFrame') -> \
+            Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Builds the Polars query plan for the donor level statistics, and
+        collects it along with the data itself at once, so that the query
+        optimizer can share the scan of the data between them and run them in
+        parallel. The donor totals are only computed (within the plan) to
+        find the level of each donor. The totals that the DonorDatabase keeps
+        are computed by aggregate_donors, as for the 'pandas' backend.
+
+        Args:
+            lf: A LazyFrame of all the payment data.
+
+        Returns:
+            The payment data and the statistics of the payments at each donor
+            level (indexed by level index), as Pandas DataFrames.
+        """
+        # The donor totals (and the level totals) are exact sums in cents
+        cents = (pl.col('amount') * 100).round().cast(pl.Int64)
+        donor_totals = lf.group_by('user_id').agg(cents.sum().alias('total'))
+
+        # The level index of each donor, see _LEVELS
+        donor_levels = donor_totals.select(
+            'user_id',
+            pl.lit(pl.Series(_LEVEL_UPPERS)).search_sorted(
+                pl.col('total').abs(), side='right').alias('level_idx')
+        )
+
+        level_stats = lf.join(donor_levels, on='user_id') \
+            .group_by('level_idx') \
+            .agg(sum=cents.sum() / 100,
+                 count=pl.len(),
+                 max=pl.col('amount').max(),
+                 min=pl.col('amount').min(),
+                 mean=pl.col('amount').mean(),
+                 median=pl.col('amount').median(),
+                 std=pl.col('amount').std(ddof=0))
+
         start = perf_counter_ns()
-        df = pd.read_csv(filepath, header=1, keep_default_na=False)
+        df, level_stats = pl.collect_all([lf, level_stats])
         stop = perf_counter_ns()
-        print(f"\tload from .csv:\t\t\t\t\t{int((stop - start) * 1e-6)} ms")
-        return df
+        print(f"\tload and aggregate (polars):\t\t"
+              f"{int((stop - start) * 1e-6)} ms")
+
+        return (
+            df.to_pandas().astype({'gl_code': 'Int64', 'postal': 'Int64'}),
+            level_stats.to_pandas().set_index('level_idx')
+        )
 
     def _load_from_excel(self, filepath: Path) -> pd.DataFrame:
         """
@@ -451,7 +805,18 @@ class DonorDatabase:
         )
 
         start = perf_counter_ns()
-        df = pd.read_excel(filepath, header=1, keep_default_na=False)
+        df = pd.read_excel(
+            filepath, header=1, keep_default_na=False,
+            parse_dates=['actual_date', 'posted_date',
+                         'membership_expiration_date'],
+            date_format='%Y-%m-%d')
+
+        # Empty cells are read as empty strings (keep_default_na=False), so
+        #  convert the (nullable) integer columns explicitly, i.e. a blank
+        #  'gl_code' or 'postal' becomes a missing value, as for a CSV file.
+        for column in ['gl_code', 'postal']:
+            df[column] = pd.to_numeric(
+                df[column].replace('', None)).astype('Int64')
         stop = perf_counter_ns()
         print(f"\tload from .xlsx:\t\t\t\t{int((stop - start) * 1e-6)} ms")
         return df
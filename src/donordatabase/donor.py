@@ -2,12 +2,13 @@
 The AAC Donor module.
 """
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Sequence, Union
 import warnings
 
 import numpy as np
 
-from .types import Name, Address, DonorLevel, Payment
+from .types import CONTRIBUTION_TYPES, Name, Address, DonorLevel, Payment, \
+    PaymentTable, _LEVELS
 
 
 class Donor:
@@ -19,7 +20,7 @@ class Donor:
                  street1: Optional[str] = None, street2: Optional[str] = None,
                  city: Optional[str] = None, state: Optional[str] = None,
                  postal: Optional[int] = None,
-                 membership_exp: Union[str, datetime] = None):
+                 membership_exp: Optional[datetime] = None):
         """
         Args:
             user_id:
@@ -32,43 +33,58 @@ class Donor:
             city:
             state:
             postal:
+            membership_exp: The membership expiration date. Date strings are
+                expected to have been parsed already, e.g. when the DataFrame
+                was loaded.
         """
         self._id = user_id
-        # Remove unwanted additional spaces between first/last names when
-        #   creating the fullname
-        full = " ".join(fullname.split()) if fullname else \
-            " ".join([firstname.strip(), lastname.strip()])
+        # Note: String fields are expected to have been stripped of
+        #   leading/trailing white space already (the DonorDatabase does this
+        #   for entire DataFrame columns at once).
         self._name = Name(
-            # Strip leading/trailing white space from all string fields
-            first=firstname.strip(),
-            last=lastname.strip(),
-            full=full
+            first=firstname,
+            last=lastname,
+            full=fullname if fullname else " ".join([firstname, lastname])
         )
-        self._email = email.strip()
+        self._email = email
         # TODO: May want to store a current address and a list of address'
         #   instead of just a single address.
         self._address = Address(
-            street1=street1.strip(),
-            street2=street2.strip(),
-            city=city.strip(),
-            state=state.strip(),
+            street1=street1,
+            street2=street2,
+            city=city,
+            state=state,
             postal=postal
         )
-        self._membership_exp = None
-        if membership_exp:
-            if isinstance(membership_exp, str):
-                membership_exp = datetime.strptime(
-                    membership_exp, '%Y-%m-%d')
-            self._membership_exp = membership_exp
-
-        # Store the payments and donations by their transaction ID
+        self._membership_exp = membership_exp if membership_exp else None
+
+        # Store the payments and donations by their transaction ID. For a
+        #  donor created by a DonorDatabase, the payments are a block of the
+        #  database's columnar payment store (rows of a PaymentTable), and
+        #  the Payments are only created (and stored) when first accessed,
+        #  i.e. the dict is None until then.
         self._payments = {}
+        self._payment_table = None
+        self._payment_rows = None
+
+        # Also store the transaction ID, type (as a categorical code, see
+        #  CONTRIBUTION_TYPES) and amount of each payment as arrays so that
+        #  reductions over the payments are vectorized. For a
+        #  donor created by a DonorDatabase, these are views into the
+        #  database's columnar payment store.
+        self._transaction_ids = np.empty(0, dtype=np.int64)
+        self._contribution_codes = np.empty(0, dtype=np.int8)
+        self._amounts = np.empty(0, dtype=np.float64)
 
         # Store some other metadata
         self._donor_level = None
-        self._contributions = {'Payment': 0.0,
-                               'Donation': 0.0,
-                               'Refund': 0.0}
+        self._largest = None
+        self._largest_rows = None
+        self._contributions = dict.fromkeys(CONTRIBUTION_TYPES, 0.0)
+
+        # Keep a running total of the contributions so that it need not be
+        #  summed on every access
+        self._total_contributions = 0.0
 
     def __repr__(self) -> str:
         return (f"{self.__class__.__name__}("
@@ -85,40 +101,39 @@ class Donor:
 
     @property
     def payments(self) -> Dict[int, Payment]:
+        if self._payments is None:
+            # Create the Payments of the payment table on first access
+            table = self._payment_table[self._payment_rows]
+            self._payments = dict(zip(table.transaction_id.tolist(),
+                                      table.to_payments()))
         return self._payments
 
     @property
     def num_payments(self) -> int:
+        if self._payments is None:
+            # The number of unique transaction IDs, without creating the
+            #  Payments
+            return np.unique(self._transaction_ids).size
         return len(self._payments)
 
     @property
     def total_contributions(self) -> float:
         """Returns the total contributions as a single value."""
-        return sum(self._contributions.values())
+        return self._total_contributions
 
     @property
     def largest_payment(self) -> Optional[Payment]:
         """Returns this donor's largest payment."""
-        max_amount = 0.0
-        max_payment = None
-        for payment in self._payments.values():
-            if payment.contribution_type == 'Payment':
-                if payment.amount > max_amount:
-                    max_amount = payment.amount
-                    max_payment = payment
-        return max_payment
+        if self._largest is None:
+            self._find_largest()
+        return self._largest['Payment']
 
     @property
     def largest_donation(self) -> Optional[Payment]:
         """Returns this donor's largest donation."""
-        max_amount = 0.0
-        max_donation = None
-        for payment in self._payments.values():
-            if payment.contribution_type == 'Donation':
-                if payment.amount > max_amount:
-                    max_amount = payment.amount
-                    max_donation = payment
-        return max_donation
+        if self._largest is None:
+            self._find_largest()
+        return self._largest['Donation']
 
     @property
     def largest_contribution(self) -> float:
@@ -129,10 +144,8 @@ class Donor:
     @property
     def level(self) -> DonorLevel:
         if self._donor_level is None:
-            for level in DonorLevel:
-                if np.abs(self.total_contributions) < level.value.upper:
-                    self._donor_level = level
-                    break
+            self._donor_level = _LEVELS[
+                DonorLevel.classify(self.total_contributions)]
         return self._donor_level
 
     def add_payment(self, transaction_id: int, user_id: int,
@@ -160,40 +173,167 @@ class Donor:
         """
         payment = None
         if self._id == user_id:
-            # Create the payment
-            payment = Payment(
-                transaction_id=transaction_id,
-                user_id=user_id,
-                contribution_type=contribution_type,
-                actual_date=actual_date,
-                posted_date=posted_date,
+            payment = self.add_payments(
+                transaction_id=[transaction_id],
+                contribution_type=[contribution_type],
+                actual_date=[actual_date],
+                posted_date=[posted_date],
+                payment_type=[payment_type],
+                response_meta=[response_meta],
+                amount=[amount],
+                gl_code=[gl_code]
+            )[0]
+        else:
+            warnings.warn(
+                f"Unable to add transaction '{transaction_id}' for user "
+                f"'{user_id}' to Donor '{self._id}'.")
+
+        return payment
+
+    def add_payments(self, transaction_id: Sequence[int],
+                     contribution_type: Sequence[str],
+                     actual_date: Sequence[Union[str, datetime]],
+                     posted_date: Sequence[Union[str, datetime]],
+                     payment_type: Sequence[str],
+                     response_meta: Sequence[str], amount: Sequence[float],
+                     gl_code: Sequence[int]) -> List[Payment]:
+        """
+        Add multiple Payments (Payments, Donations or Refunds) for the donor.
+        Each argument is a column of payment data, i.e. the i-th Payment is
+        created from the i-th element of every column.
+
+        Args:
+            transaction_id:
+            contribution_type:
+            actual_date:
+            posted_date:
+            payment_type:
+            response_meta:
+            amount:
+            gl_code:
+
+        Returns:
+            The Payments that were created for the provided payment data.
+        """
+        payments = [
+            Payment(
+                transaction_id=txn_id,
+                user_id=self._id,
+                contribution_type=c_type,
+                actual_date=actual,
+                posted_date=posted,
                 firstname=self._name.first,
                 lastname=self._name.last,
                 fullname=self._name.full,
                 email=self._email,
-                payment_type=payment_type,
-                response_meta=response_meta,
-                amount=amount,
-                gl_code=gl_code,
+                payment_type=p_type,
+                response_meta=meta,
+                amount=value,
+                gl_code=code,
                 street1=self._address.street1,
                 street2=self._address.street2,
                 city=self._address.city,
                 state=self._address.state,
                 postal=self._address.postal
-            )
+            ) for txn_id, c_type, actual, posted, p_type, meta, value, code in
+            zip(transaction_id, contribution_type, actual_date, posted_date,
+                payment_type, response_meta, amount, gl_code)
+        ]
+        return self.extend_payments(payments)
 
-            # Add payment to list of payments
-            self._payments[transaction_id] = payment
+    def extend_payments(
+            self, payments: Union[Sequence[Payment], PaymentTable],
+            contributions: Optional[Dict[str, float]] = None,
+            largest: Optional[Dict[str, int]] = None,
+            rows: slice = slice(None)
+    ) -> Union[List[Payment], PaymentTable]:
+        """
+        Add multiple already created Payments (e.g. via Payment.from_records),
+        or rows of a PaymentTable, for the donor. For a PaymentTable, the
+        arrays of the donor are views of the table's columns and, if these are
+        the donor's first payments, the Payments are only created when first
+        accessed.
+
+        Args:
+            payments: The Payments, or a PaymentTable of the payments, all of
+                which (i.e. all of the given rows) belong to this donor.
+            contributions: The total value of the payments for each
+                contribution type, if already known (e.g. via a DataFrame
+                groupby). If not provided, it is accumulated
+                payment-by-payment.
+            largest: The index (into payments, or into the given rows) of
+                the largest 'Payment' and of the largest 'Donation' (-1 if
+                none), if already known. Only used if the donor has no prior
+                payments.
+            rows: For a PaymentTable, the (contiguous) rows of this donor's
+                payments. Passing the rows, rather than a slice of the table,
+                avoids creating a view of every column up front.
 
-            # Update the contribution values.
-            # Note: expect 'Refund' payments to have a negative 'amount'.
-            self._contributions[payment.contribution_type] += payment.amount
+        Returns:
+            The Payments, or the PaymentTable.
+        """
+        if isinstance(payments, PaymentTable):
+            transaction_id = payments.transaction_id[rows]
+            contribution_code = payments.contribution_type.codes[rows]
+            amount = payments.amount[rows]
         else:
-            warnings.warn(
-                f"Unable to add transaction '{transaction_id}' for user "
-                f"'{user_id}' to Donor '{self._id}'.")
+            payments = list(payments)
+            transaction_id = np.array(
+                [p.transaction_id for p in payments], dtype=np.int64)
+            amount = np.array([p.amount for p in payments], dtype=np.float64)
+            # Get the categorical codes of the contribution types (see
+            #  CONTRIBUTION_TYPES)
+            contribution_code = np.array(
+                [CONTRIBUTION_TYPES.index(p.contribution_type)
+                 for p in payments], dtype=np.int8)
 
-        return payment
+        # Update the contribution values.
+        # Note: expect 'Refund' payments to have a negative 'amount'.
+        if contributions is None:
+            contributions = {}
+            for code, value in zip(contribution_code.tolist(),
+                                   amount.tolist()):
+                contributions[CONTRIBUTION_TYPES[code]] = \
+                    contributions.get(CONTRIBUTION_TYPES[code], 0.0) + value
+        for c_type, value in contributions.items():
+            self._contributions[c_type] += value
+            self._total_contributions += value
+        self._donor_level = None
+
+        self._largest = None
+        self._largest_rows = None
+        if not self._amounts.size and isinstance(payments, PaymentTable):
+            # Keep the table of the donor's first payments, whose Payments
+            #  are only created when first accessed
+            self._payments = None
+            self._payment_table = payments
+            self._payment_rows = rows
+            self._largest_rows = largest
+        else:
+            # Add the payments to the dict of payments
+            new_payments = payments[rows].to_payments() \
+                if isinstance(payments, PaymentTable) else payments
+            self.payments.update((p.transaction_id, p) for p in new_payments)
+            self._payment_table = None
+            self._payment_rows = None
+            if largest is not None and not self._amounts.size:
+                self._largest = {
+                    c_type: new_payments[idx] if idx >= 0 else None
+                    for c_type, idx in largest.items()}
+
+        # Add the payments to the payment arrays. Avoid copying the arrays if
+        #  these are the donor's first payments.
+        if self._amounts.size:
+            transaction_id = np.concatenate(
+                [self._transaction_ids, transaction_id])
+            contribution_code = np.concatenate(
+                [self._contribution_codes, contribution_code])
+            amount = np.concatenate([self._amounts, amount])
+        self._transaction_ids = transaction_id
+        self._contribution_codes = contribution_code
+        self._amounts = amount
+
+        return payments
 
     def get_payments(self, start: Union[str, datetime],
                      end: Union[str, datetime]) -> List[Payment]:
@@ -202,3 +342,30 @@ class Donor:
         ordered from most recent to earliest.
         """
         pass
+
+    def _find_largest(self) -> None:
+        """
+        Finds (and stores) this donor's largest (positive) payment and largest
+        (positive) donation, so that neither has to be found again until
+        another payment is added.
+        """
+        if self._largest_rows is not None:
+            # The rows of the largest payment and donation are already known
+            begin = self._payment_rows.indices(len(self._payment_table))[0]
+            self._largest = {
+                c_type: self._payment_table[begin + idx] if idx >= 0 else None
+                for c_type, idx in self._largest_rows.items()}
+            return
+
+        self._largest = {}
+        for contribution_type in ['Payment', 'Donation']:
+            amounts = np.where(
+                self._contribution_codes ==
+                CONTRIBUTION_TYPES.index(contribution_type),
+                self._amounts, 0.0)
+            largest = None
+            if amounts.size:
+                idx = np.argmax(amounts)
+                if amounts[idx] > 0.0:
+                    largest = self.payments[int(self._transaction_ids[idx])]
+            self._largest[contribution_type] = largest
@@ -1,22 +1,38 @@
 """
 The AAC Types module.
 """
-from collections import namedtuple
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from enum import Enum
-from typing import Optional
+import sys
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, \
+    Union
 import warnings
 
 import numpy as np
+import pandas as pd
 
-from .utils import string_to_datetime, currency_to_str
+from .utils import string_to_datetime, currency_to_str, to_cents, to_list
 
-Name = namedtuple('Name', ['first', 'last', 'full'])
-Range = namedtuple('Range', ['lower', 'upper'])
+# The contribution types of a Payment. Where contribution types are stored as
+#  categorical (int8) codes, the code of a type is its index in this list.
+CONTRIBUTION_TYPES = ['Payment', 'Donation', 'Refund']
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class Name:
+    first: str
+    last: str
+    full: str
+
+
+@dataclass(frozen=True, slots=True)
+class Range:
+    lower: int
+    upper: int
+
+
+@dataclass(frozen=True, slots=True)
 class Address:
     street1: str
     street2: str
@@ -40,17 +56,63 @@ class DonorLevel(Enum):
     DONORLEVEL_NINE = Range(lower=75_000, upper=100_000)
     DONORLEVEL_TEN = Range(lower=100_000, upper=250_000)
 
+    def __init__(self, bounds: Range):
+        # The bounds never change, so format the repr/str of each DonorLevel
+        #  only once, when the member is created.
+        self._repr = (f"({self.name}: "
+                      f"lower={currency_to_str(bounds.lower)}, "
+                      f"upper={currency_to_str(bounds.upper)})")
+        self._str = (f"{currency_to_str(bounds.lower)} - "
+                     f"{currency_to_str(bounds.upper)}")
+
     def __repr__(self):
-        return (f"({self.name}: "
-                f"lower={currency_to_str(self.value.lower)}, "
-                f"upper={currency_to_str(self.value.upper)})")
+        return self._repr
 
     def __str__(self):
-        return (f"{currency_to_str(self.value.lower)} - "
-                f"{currency_to_str(self.value.upper)}")
+        return self._str
+
+    @property
+    def lower(self) -> int:
+        """The lower bound of this DonorLevel."""
+        return self.value.lower
+
+    @property
+    def upper(self) -> int:
+        """The upper bound of this DonorLevel."""
+        return self.value.upper
+
+    @classmethod
+    def classify(cls, amounts: Union[float, np.ndarray]) -> \
+            Union[int, np.ndarray]:
+        """
+        Classifies one or many (total contribution) amounts into DonorLevels
+        via a single binary search of the level bounds, rather than testing
+        each DonorLevel in turn.
+
+        Args:
+            amounts: A single amount or an array of amounts.
+
+        Returns:
+            The level index of each amount, i.e. its index into _LEVELS. An
+            amount greater than the upper bound of the highest DonorLevel has
+            index len(DonorLevel), i.e. no level (None).
+        """
+        return np.searchsorted(_LEVEL_UPPERS, to_cents(np.abs(amounts)),
+                               side='right')
 
 
-@dataclass
+# The (lower, upper) bounds of every DonorLevel, in cents, as a single
+#  contiguous array. The upper bounds are used to classify many contribution
+#  amounts at once via np.searchsorted (see DonorLevel.classify). An amount
+#  greater than the upper bound of the highest DonorLevel does not have a level
+#  (None).
+_LEVEL_RANGES = np.array([(level.lower, level.upper) for level in DonorLevel],
+                         dtype=np.int64) * 100
+_LEVEL_UPPERS = _LEVEL_RANGES[:, 1]
+_LEVELS = np.array(list(DonorLevel) + [None], dtype=object)
+
+
+@dataclass(slots=True)
 class DonorLevelStats:
     """
     level: The DonorLevel for this set of statistics.
@@ -83,7 +145,7 @@ class DonorLevelStats:
                 f"median: ${self.median:,.2f})")
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True)
 class Payment:
     transaction_id: int
     user_id: int
@@ -112,33 +174,236 @@ class Payment:
                 f"amount: ${self.amount:,.2f}, "
                 f"type: {self.contribution_type})")
 
-    def __post_init__(self):
+    def __hash__(self):
+        # A Payment is identified by its transaction ID
+        return hash(self.transaction_id)
+
+    @property
+    def amount_cents(self) -> int:
+        """The amount in (whole) cents."""
+        return int(to_cents(self.amount))
+
+    @classmethod
+    def from_records(
+            cls, records: Union[pd.DataFrame, Sequence[Dict[str, Any]]]
+    ) -> List['Payment']:
+        """
+        Creates many Payments at once from a table of payment data. The dates
+        are parsed (and the missing dates filled) a column at a time, rather
+        than payment-by-payment in __post_init__.
+
+        Args:
+            records: A DataFrame, or a list of dicts, with a column/key for
+                each Payment field.
+
+        Returns:
+            The Payments, in the order of the records.
         """
-        For more info on setting an attribute of a 'frozen' dataclass object
-        via the __post_init__ method, see:
-        https://stackoverflow.com/questions/53756788/how-to-set-the-value-of-dataclass-field-in-post-init-when-frozen-true
+        return PaymentTable.from_records(records).to_payments()
 
-        "There is a tiny performance penalty when using frozen=True: __init__()
-        cannot use simple assignment to initialize fields, and must use
-        object.__setattr__(self, 'attr_name', value)."
+    def __post_init__(self):
+        """
+        Payment is not a 'frozen' dataclass, so __init__() and __post_init__()
+        can use simple assignment to initialize fields rather than
+        object.__setattr__(self, 'attr_name', value). With slots=True, the
+        fields are stored in slots rather than a per-instance __dict__.
         """
+        # The contribution type, payment type and state take only a few
+        #  distinct values, so intern them such that equal values share a
+        #  single string object
+        if self.contribution_type:
+            self.contribution_type = sys.intern(self.contribution_type)
+        if self.payment_type:
+            self.payment_type = sys.intern(self.payment_type)
+        if self.state:
+            self.state = sys.intern(self.state)
+
         # Convert actual_date to datetime object
         if isinstance(self.actual_date, str):
-            actual_date = string_to_datetime(self.actual_date, '%Y-%m-%d')
-            object.__setattr__(self, 'actual_date', actual_date)
+            self.actual_date = string_to_datetime(self.actual_date, '%Y-%m-%d')
 
         # Convert posted_date to datetime object
         if isinstance(self.posted_date, str):
-            posted_date = string_to_datetime(self.posted_date, '%Y-%m-%d')
-            object.__setattr__(self, 'posted_date', posted_date)
-
-        if not self.actual_date and self.posted_date:
-            warnings.warn(f"{self} has neither a valid 'actual_date' nor a "
-                          f"valid 'posted_date'.")
-
-        # Use the posted date as the actual date if no posted date is given, and
-        #  vice versa.
-        actual = self.actual_date if self.actual_date else self.posted_date
-        posted = self.posted_date if self.posted_date else self.actual_date
-        object.__setattr__(self, 'actual_date', actual)
-        object.__setattr__(self, 'posted_date', posted)
+            self.posted_date = string_to_datetime(self.posted_date, '%Y-%m-%d')
+
+        # Only the transaction ID is formatted, not the whole Payment.
+        if not (self.actual_date or self.posted_date):
+            warnings.warn(f"Payment {self.transaction_id} has neither a valid "
+                          f"'actual_date' nor a valid 'posted_date'.")
+
+        # Use the posted date as the actual date if no actual date is given,
+        #  and vice versa. The posted date can fall back to the already
+        #  resolved actual date, since that is only the posted date if both
+        #  are missing.
+        self.actual_date = self.actual_date or self.posted_date
+        self.posted_date = self.posted_date or self.actual_date
+
+
+class PaymentTable:
+    """
+    A table of payments stored as columns (struct-of-arrays) rather than as
+    individual Payment objects, so that reductions over the payments (e.g. the
+    sum of the amounts) are vectorized. There is a column for each Payment
+    field:
+
+    - transaction_id, user_id: int64 arrays.
+    - amount: A float64 array. The amounts are also stored as exact int64
+        cents (amount_cents), which the totals are computed from.
+    - actual_date, posted_date: datetime64 arrays (NaT if missing).
+    - contribution_type, payment_type, state: Categoricals, i.e. int8 codes
+        and a list of categories. The categories of contribution_type are
+        CONTRIBUTION_TYPES.
+    - gl_code, postal: Nullable Int64 arrays.
+    - The remaining (string) fields: (Arrow-backed) string arrays if given as
+        such, otherwise object arrays.
+
+    The Payment of a row is only created when it is first accessed (via
+    indexing or to_payments), and is then kept, i.e. the same Payment is
+    returned on every access. A slice of the table shares these Payments.
+    """
+    _FIELDS = tuple(f.name for f in fields(Payment))
+    _COLUMNS = _FIELDS + ('amount_cents',)
+    __slots__ = _COLUMNS + ('_payments',)
+
+    _INTEGERS = ('transaction_id', 'user_id')
+    _NULLABLE_INTEGERS = ('gl_code', 'postal')
+    _CATEGORICALS = ('contribution_type', 'payment_type', 'state')
+
+    def __init__(self, **columns: Any):
+        """
+        Args:
+            columns: A column (of equal length) for each Payment field, and
+                amount_cents.
+        """
+        for name in self._COLUMNS:
+            setattr(self, name, columns[name])
+
+        # The Payment of every row, or None if not created yet
+        self._payments = np.full(len(self), None, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.transaction_id)
+
+    def __getitem__(self, index: Union[int, slice]) -> \
+            Union[Payment, 'PaymentTable']:
+        """
+        Returns the Payment in the given row, or a PaymentTable of the given
+        rows (a view of the columns) for a slice.
+        """
+        if isinstance(index, slice):
+            table = self.__class__(**{name: getattr(self, name)[index]
+                                      for name in self._COLUMNS})
+            table._payments = self._payments[index]
+            return table
+
+        if self._payments[index] is None:
+            self._payments[index] = \
+                self[index:index + 1 or None]._create_payments()[0]
+        return self._payments[index]
+
+    @classmethod
+    def from_records(
+            cls, records: Union[pd.DataFrame, Mapping[str, Any],
+                                Sequence[Dict[str, Any]]]
+    ) -> 'PaymentTable':
+        """
+        Creates a PaymentTable from a table of payment data. The dates are
+        parsed (and the missing dates filled) a column at a time.
+
+        Args:
+            records: A DataFrame, a dict of columns (arrays), or a list of
+                dicts, with a column/key for each Payment field.
+
+        Returns:
+            A PaymentTable, in the order of the records.
+        """
+        if not isinstance(records, (pd.DataFrame, Mapping)):
+            # An empty list of dicts has no keys, i.e. gives no columns
+            records = list(records)
+            records = pd.DataFrame(
+                records, columns=None if records else list(cls._FIELDS))
+
+        columns = {}
+        for name in cls._FIELDS:
+            column = records[name]
+            if name in cls._INTEGERS:
+                columns[name] = np.asarray(column, dtype=np.int64)
+            elif name in cls._NULLABLE_INTEGERS:
+                columns[name] = pd.array(column, dtype='Int64')
+            elif name == 'contribution_type':
+                columns[name] = pd.Categorical(column,
+                                               categories=CONTRIBUTION_TYPES)
+            elif name in cls._CATEGORICALS:
+                columns[name] = pd.Categorical(column)
+            elif name == 'amount':
+                columns[name] = np.asarray(column, dtype=np.float64)
+                columns['amount_cents'] = to_cents(columns[name])
+            elif isinstance(getattr(column, 'dtype', None), pd.StringDtype):
+                # Keep (Arrow-backed) strings as such, rather than creating a
+                #  Python string for every row
+                columns[name] = pd.array(column)
+            elif name not in ('actual_date', 'posted_date'):
+                columns[name] = np.asarray(column, dtype=object)
+
+        # Parse both date columns in a single pass each. Each unique date
+        #  string is only parsed once (cache=True). Empty dates are missing,
+        #  but an invalid date raises a ValueError, as in __post_init__.
+        actual = pd.Series(pd.to_datetime(
+            records['actual_date'], format='%Y-%m-%d', errors='raise',
+            cache=True))
+        posted = pd.Series(pd.to_datetime(
+            records['posted_date'], format='%Y-%m-%d', errors='raise',
+            cache=True))
+
+        # Use the posted date as the actual date if no posted date is given,
+        #  and vice versa.
+        columns['actual_date'] = actual.fillna(posted).to_numpy()
+        columns['posted_date'] = posted.fillna(actual).to_numpy()
+
+        # A payment with neither date is warned about once it is created (see
+        #  Payment.__post_init__), not here as well.
+        return cls(**columns)
+
+    @classmethod
+    def from_payments(cls, payments: Iterable[Payment]) -> 'PaymentTable':
+        """
+        Creates a PaymentTable from Payments.
+
+        Args:
+            payments: The Payments.
+
+        Returns:
+            A PaymentTable, in the order of the Payments.
+        """
+        return cls.from_records(pd.DataFrame(
+            [[getattr(payment, name) for name in cls._FIELDS]
+             for payment in payments], columns=list(cls._FIELDS)))
+
+    def to_payments(self) -> List[Payment]:
+        """
+        Returns the Payment of every row of the table. The Payments that have
+        not been created yet are created at once.
+
+        Returns:
+            The Payments, in the order of the rows.
+        """
+        missing = np.flatnonzero(np.equal(self._payments, None))
+        if missing.size == len(self):
+            self._payments[:] = self._create_payments()
+        elif missing.size:
+            self._payments[missing] = self._take(missing)._create_payments()
+        return self._payments.tolist()
+
+    def _take(self, rows: np.ndarray) -> 'PaymentTable':
+        """Returns a PaymentTable of (a copy of) the given rows."""
+        return self.__class__(**{name: getattr(self, name)[rows]
+                                 for name in self._COLUMNS})
+
+    def _create_payments(self) -> List[Payment]:
+        """
+        Creates a (new) Payment for every row of the table. Missing values
+        (e.g. NaT dates) become None.
+        """
+        columns = [to_list(pd.Series(getattr(self, name), copy=False))
+                   for name in self._FIELDS]
+        return [Payment(*values) for values in zip(*columns)]
@@ -2,21 +2,78 @@
 The AAC Utilities module.
 """
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import Any, List, Optional, Union
 
+import numpy as np
+import pandas as pd
 
+
+@lru_cache(maxsize=8192)
 def string_to_datetime(date_str: str, format: str) -> Optional[datetime]:
     """
     Converts a string to a datetime object. Note that the datetime module
     does not seem to have a NaT representation like np.datetime64('NaT'), so if
     an empty string is provided, None is returned.
 
+    The same dates tend to appear many times (e.g. many payments are posted on
+    the same day), so the results are cached. A datetime is immutable, so the
+    cached object can safely be shared.
+
     Args:
         date_str:
         format:
     """
-    return datetime.strptime(date_str, format) if date_str else None
+    if not date_str:
+        return None
 
+    # Parse ISO dates (by far the most common format) directly, rather than via
+    #  strptime's (slow) interpretation of the format string. Anything that is
+    #  not of the form 'YYYY-MM-DD' (with ASCII digits only, since int()
+    #  would also accept e.g. signs) is left to strptime, e.g. to raise.
+    if format == '%Y-%m-%d' and len(date_str) == 10 and \
+            date_str[4] == date_str[7] == '-' and date_str.isascii() and \
+            (date_str[:4] + date_str[5:7] + date_str[8:]).isdigit():
+        return datetime(int(date_str[0:4]), int(date_str[5:7]),
+                        int(date_str[8:10]))
+    return datetime.strptime(date_str, format)
 
-def currency_to_str(value: int) -> str:
+
+@lru_cache(maxsize=256)
+def currency_to_str(value: float) -> str:
+    # Cached, since the values are typically a few constants (e.g. the
+    #  DonorLevel bounds)
     return f"${value:.0f}" if value < 1000 else f"${(value / 1e3):,.0f}k"
+
+
+def to_cents(amount: Union[float, np.ndarray]) -> Union[int, np.ndarray]:
+    """
+    Converts one or many dollar amounts to (whole) cents. Sums of amounts in
+    cents are exact, whereas sums of float dollar amounts accumulate rounding
+    error. A missing (NaN) or infinite amount has no value in cents, so
+    raises a ValueError.
+
+    Args:
+        amount: A single amount or an array of amounts, in dollars.
+    """
+    if not np.isfinite(amount).all():
+        raise ValueError("Cannot convert a missing (NaN) or infinite amount "
+                         "to cents.")
+    return np.rint(np.multiply(amount, 100)).astype(np.int64)
+
+
+def to_list(series: pd.Series) -> List[Any]:
+    """
+    Converts a Pandas Series to a list of Python objects. Dates become
+    datetime objects (rather than Pandas Timestamps). Missing values (NaT, NA,
+    NaN) are replaced with None, e.g. so that a missing date is falsy.
+
+    Args:
+        series: The Series to convert.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = pd.Series(series.dt.to_pydatetime(), index=series.index,
+                           dtype=object)
+    else:
+        values = series.astype(object)
+    return values.where(series.notna(), None).tolist()
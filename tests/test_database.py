@@ -0,0 +1,196 @@
+"""
+Tests for loading a DonorDatabase.
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from donordatabase import DonorDatabase
+
+HEADER = ("transaction_id,user_id,type,actual_date,posted_date,firstname,"
+          "lastname,full_name,email,payment_type,response_meta,amount,"
+          "gl_code,street_1,street_2,city,state,postal,"
+          "membership_expiration_date")
+ROWS = [
+    "1,1,Payment,2023-01-02,2023-01-02,Dee,Jones,,d@x.org,Credit,NA,10.5,"
+    "4000,1 Main St,,Boulder,CO,80301,2025-06-30",
+    "2,1,Donation,,2023-02-03,Dee,Jones,,d@x.org,Credit,ok,20.25,"
+    ",1 Main St,,Boulder,CO,,",
+    "3,2,Refund,2023-03-04,,Ann,Lee,,a@x.org,Check,ok,-5.0,"
+    "4100,2 Elm St,,Denver,CO,,",
+]
+
+
+def write_csv(path):
+    path.write_text("Exported Donor Report,,,\n" +
+                    "\n".join([HEADER] + ROWS) + "\n")
+    return path
+
+
+def check_blank_cells(db):
+    # Blank numeric cells are missing values, blank string cells are not
+    assert db._df['gl_code'].isna().tolist() == [False, True, False]
+    assert db._df['postal'].isna().tolist() == [False, True, True]
+    assert db._df['street_2'].tolist() == ['', '', '']
+    assert db._df['response_meta'].tolist() == ['NA', 'ok', 'ok']
+    assert db.donors[1]._address.postal == 80301
+    assert db.donors[2]._address.postal is None
+    assert db.total_contributions == 25.75
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'polars'])
+def test_csv_blank_cells(tmp_path, backend):
+    if backend == 'polars':
+        pytest.importorskip('polars')
+    check_blank_cells(DonorDatabase(write_csv(tmp_path / 'payments.csv'),
+                                    backend=backend))
+
+
+def write_xlsx(path):
+    # Blank numeric cells are written as empty cells
+    records = pd.read_csv(write_csv(path.with_suffix('.csv')), header=1,
+                          keep_default_na=False,
+                          na_values={'gl_code': '', 'postal': ''})
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame([['Exported Donor Report']]).to_excel(
+            writer, index=False, header=False)
+        records.to_excel(writer, index=False, startrow=1)
+    return path
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'polars'])
+def test_xlsx_blank_cells(tmp_path, backend):
+    pytest.importorskip('openpyxl')
+    if backend == 'polars':
+        pytest.importorskip('polars')
+    check_blank_cells(DonorDatabase(write_xlsx(tmp_path / 'payments.xlsx'),
+                                    backend=backend))
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'polars'])
+def test_xlsx_and_csv(tmp_path, backend):
+    pytest.importorskip('openpyxl')
+    if backend == 'polars':
+        pytest.importorskip('polars')
+    db = DonorDatabase([write_xlsx(tmp_path / 'a.xlsx'),
+                        write_csv(tmp_path / 'b.csv')], backend=backend)
+    assert db._df['gl_code'].isna().tolist() == [False, True, False] * 2
+    assert db._df['postal'].isna().tolist() == [False, True, True] * 2
+
+
+def test_csv_cache(tmp_path):
+    filepath = write_csv(tmp_path / 'payments.csv')
+    # An unrelated Parquet file of the same name is not used as the cache
+    pd.DataFrame({'x': [1]}).to_parquet(tmp_path / 'payments.parquet')
+    check_blank_cells(DonorDatabase(filepath))
+
+    cache = tmp_path / '.payments.donordatabase.parquet'
+    assert cache.exists()
+    check_blank_cells(DonorDatabase(filepath))
+
+    # A cache without the expected schema is ignored (and replaced)
+    pd.DataFrame({'x': [1]}).to_parquet(cache)
+    with pytest.warns(UserWarning, match='expected schema'):
+        check_blank_cells(DonorDatabase(filepath))
+    check_blank_cells(DonorDatabase(filepath))
+
+
+def test_get_top_donors(tmp_path):
+    db = DonorDatabase(write_csv(tmp_path / 'payments.csv'))
+    assert db.get_top_donors(0) == []
+    with pytest.raises(ValueError):
+        db.get_top_donors(-1)
+    top = db.get_top_donors(1)
+    assert top == [db.donors[1]]
+
+    # The same once all donors have been sorted
+    db.get_donors_by_level()
+    assert db.get_top_donors(0) == []
+    with pytest.raises(ValueError):
+        db.get_top_donors(-1)
+    assert db.get_top_donors(1) == top
+
+
+def test_payments_created_on_demand(tmp_path):
+    db = DonorDatabase(write_csv(tmp_path / 'payments.csv'))
+    donor = db.donors[1]
+    assert donor._payments is None and db._payments is None
+    assert donor.num_payments == 2
+    assert donor.largest_donation.amount == 20.25
+
+    # The donors and the database share the same Payments
+    assert donor.largest_donation is donor.payments[2]
+    assert db.payments[2] is donor.payments[2]
+    assert db.payments[3] is db.donors[2].payments[3]
+    assert db.timespan.days == 61
+
+
+def test_dates_are_datetimes(tmp_path):
+    db = DonorDatabase(write_csv(tmp_path / 'payments.csv'))
+    for payment in db.payments.values():
+        assert type(payment.actual_date) is datetime
+        assert type(payment.posted_date) is datetime
+    assert type(db.donors[1]._membership_exp) is datetime
+    assert db.donors[2]._membership_exp is None
+    assert type(db.earliest_payment) is datetime
+    assert type(db.timespan) is timedelta
+
+
+@pytest.mark.parametrize('backend', ['pandas', 'polars'])
+def test_missing_amount(tmp_path, backend):
+    if backend == 'polars':
+        pytest.importorskip('polars')
+    path = write_csv(tmp_path / 'payments.csv')
+    path.write_text(path.read_text().replace(',20.25,', ',,'))
+    with pytest.raises(ValueError, match=r'\[2\]'):
+        DonorDatabase(path, backend=backend)
+
+
+def write_other_csv(path):
+    # Whole-dollar amounts and a numeric-looking 'response_meta'
+    path.write_text("Exported Donor Report,,,\n" + "\n".join([
+        HEADER,
+        "4,3,Donation,2023-04-05,2023-04-05,Bo,Kim,,b@x.org,Credit,200,500,"
+        "4000,3 Oak St,,Golden,CO,80401,",
+        "5,1,Donation,2023-05-06,2023-05-06,Dee,Jones,,d@x.org,Credit,200,"
+        "100,4000,1 Main St,,Boulder,CO,80301,"
+    ]) + "\n")
+    return path
+
+
+def test_polars_files_share_schema(tmp_path):
+    pytest.importorskip('polars')
+    filepaths = [write_csv(tmp_path / 'a.csv'),
+                 write_other_csv(tmp_path / 'b.csv')]
+    db = DonorDatabase(filepaths, backend='polars')
+    expected = DonorDatabase(filepaths)
+    assert db._df['amount'].tolist() == expected._df['amount'].tolist()
+    assert db.donors[3].payments[4].response_meta == '200'
+    assert db.total_contributions == expected.total_contributions == 625.75
+
+
+def test_polars_level_stats(tmp_path):
+    pytest.importorskip('polars')
+    filepaths = [write_csv(tmp_path / 'a.csv'),
+                 write_other_csv(tmp_path / 'b.csv')]
+    db = DonorDatabase(filepaths, backend='polars')
+    expected = DonorDatabase(filepaths)
+    assert db._level_stats is not None and expected._level_stats is None
+
+    by_level = db.get_donors_by_level()
+    assert list(by_level) == list(expected.get_donors_by_level())
+    assert [[donor._id for donor in donors] for donors in by_level.values()] \
+        == [[donor._id for donor in donors]
+            for donors in expected.get_donors_by_level().values()]
+
+    stats = db.get_donor_level_stats()
+    expected_stats = expected.get_donor_level_stats()
+    assert list(stats) == list(expected_stats)
+    for level, level_stats in stats.items():
+        other = expected_stats[level]
+        assert level_stats.payments.tolist() == other.payments.tolist()
+        for name in ('n_donors', 'n_payments', 'total', 'max', 'min', 'mean',
+                     'std', 'median'):
+            assert getattr(level_stats, name) == \
+                pytest.approx(getattr(other, name)), name
@@ -0,0 +1,38 @@
+"""
+Tests for the kernels.
+"""
+import numpy as np
+
+from donordatabase import _kernels
+from donordatabase.types import _LEVEL_UPPERS
+
+
+def random_donors(seed=0, n_donors=200):
+    """Returns the donor offsets, amounts (in cents) and type codes."""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, 8, n_donors)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    amount = rng.integers(-50_000, 5_000_000, offsets[-1])
+    type_code = rng.integers(0, 3, offsets[-1]).astype(np.int8)
+    # Include donors without any (positive) payments or donations
+    amount[:offsets[3]] = -amount[:offsets[3]].clip(min=1)
+    return offsets, amount, type_code
+
+
+def test_aggregate_donors():
+    offsets, amount, type_code = random_donors()
+    # The Numba implementation is compiled if Numba is installed, otherwise
+    #  it is run as plain Python
+    numba_impl = _kernels._aggregate_donors_numba
+    try:
+        from numba import njit
+        numba_impl = njit(numba_impl)
+    except ImportError:
+        pass
+    expected = _kernels._aggregate_donors_numpy(
+        offsets, amount, type_code, _LEVEL_UPPERS)
+    result = numba_impl(offsets, amount, type_code, _LEVEL_UPPERS)
+    assert (expected[2][:3] == -1).all() and (expected[3][:3] == -1).all()
+    for expected_array, array in zip(expected, result):
+        np.testing.assert_array_equal(array, expected_array)
+
@@ -0,0 +1,51 @@
+"""
+Tests for the Payment and PaymentTable types.
+"""
+from dataclasses import fields
+from datetime import datetime
+
+import pytest
+
+from donordatabase.types import Payment, PaymentTable
+
+RECORD = dict(
+    transaction_id=1, user_id=1, contribution_type='Payment',
+    actual_date='2023-01-02', posted_date='', firstname='Dee',
+    lastname='Jones', fullname='Dee Jones', email='d@x.org',
+    payment_type='Credit', response_meta='ok', amount=10.0, gl_code=4000,
+    street1='1 Main St', street2='', city='Boulder', state='CO',
+    postal=80301)
+
+
+def test_from_records_matches_init():
+    payment, = Payment.from_records([RECORD])
+    assert payment == Payment(**RECORD)
+    assert payment.posted_date == payment.actual_date
+    assert type(payment.actual_date) is datetime
+    assert type(payment.posted_date) is datetime
+
+
+def test_invalid_date():
+    record = dict(RECORD, actual_date='2023-02-30')
+    with pytest.raises(ValueError):
+        Payment(**record)
+    with pytest.raises(ValueError):
+        PaymentTable.from_records([record])
+
+
+def test_repr_follows_changes():
+    payment = Payment(**RECORD)
+    assert '$10.00' in repr(payment)
+    payment.amount = 99.0
+    assert '$99.00' in repr(payment)
+    assert '_repr' not in [f.name for f in fields(payment)]
+
+
+def test_missing_amount():
+    with pytest.raises(ValueError):
+        PaymentTable.from_records([dict(RECORD, amount=float('nan'))])
+
+
+def test_from_records_empty():
+    assert Payment.from_records([]) == []
+    assert len(PaymentTable.from_records([])) == 0
@@ -0,0 +1,26 @@
+"""
+Tests for the utilities.
+"""
+from datetime import datetime
+
+import pytest
+
+from donordatabase.utils import currency_to_str, string_to_datetime
+
+
+def test_string_to_datetime():
+    assert string_to_datetime('2023-01-05', '%Y-%m-%d') == \
+        datetime(2023, 1, 5)
+    assert string_to_datetime('', '%Y-%m-%d') is None
+
+
+@pytest.mark.parametrize('date_str', [
+    '2023-+1-05', '+023-01-05', '2023- 1-05', '2023-01-０５', '2023-02-30'])
+def test_string_to_datetime_invalid(date_str):
+    with pytest.raises(ValueError):
+        string_to_datetime(date_str, '%Y-%m-%d')
+
+
+def test_currency_to_str():
+    assert currency_to_str(500) == '$500'
+    assert currency_to_str(2500) == currency_to_str(2500.0) == '$2k'